@@ -1,7 +1,11 @@
 import streamlit as st
-import pickle
 import numpy as np
+import gc
 import os
+import struct
+from typing import Callable, NamedTuple, Optional
+
+from export_model import COEF_FORMAT, DIGEST_SIZE, SOURCE_FILES, linear_coefficients, source_digest
 
 # Set page configuration
 st.set_page_config(
@@ -11,166 +15,263 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+
+@st.cache_data
+def load_css():
+    """Read the custom stylesheet once and reuse it across reruns"""
+    with open('assets/style.css') as f:
+        return f.read()
+
+
 # Custom CSS for professional styling
-st.markdown("""
-<style>
-    .main {
-        padding-top: 2rem;
-    }
-
-    .title-container {
-        text-align: center;
-        margin-bottom: 3rem;
-        padding: 2rem 0;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        border-radius: 15px;
-        color: white;
-        box-shadow: 0 4px 15px rgba(0,0,0,0.1);
-    }
-
-    .title-container h1 {
-        margin: 0;
-        font-size: 3rem;
-        font-weight: 700;
-    }
-
-    .subtitle {
-        font-size: 1.2rem;
-        margin-top: 1rem;
-        opacity: 0.9;
-    }
-
-    .input-container {
-        background: white;
-        padding: 2rem;
-        border-radius: 15px;
-        box-shadow: 0 4px 20px rgba(0,0,0,0.1);
-        margin: 2rem 0;
-        border: 1px solid #e0e0e0;
-    }
-
-    .prediction-container {
-        text-align: center;
-        padding: 2rem;
-        margin: 2rem 0;
-        background: linear-gradient(135deg, #4CAF50 0%, #45a049 100%);
-        color: white;
-        border-radius: 15px;
-        box-shadow: 0 4px 20px rgba(76, 175, 80, 0.3);
-        animation: fadeIn 0.5s ease-in;
-    }
-
-    @keyframes fadeIn {
-        from { opacity: 0; transform: translateY(20px); }
-        to { opacity: 1; transform: translateY(0); }
-    }
-
-    .prediction-container h2 {
-        margin: 0;
-        font-size: 2.5rem;
-        font-weight: 700;
-    }
-
-    .stButton > button {
-        width: 100%;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        border: none;
-        border-radius: 25px;
-        padding: 1rem 2rem;
-        font-size: 1.2rem;
-        font-weight: 600;
-        margin-top: 1rem;
-        transition: all 0.3s ease;
-        box-shadow: 0 4px 15px rgba(102, 126, 234, 0.3);
-    }
-
-    .stButton > button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 6px 20px rgba(102, 126, 234, 0.4);
-    }
-
-    .info-box {
-        background: #f8f9fa;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 5px solid #17a2b8;
-        margin: 1rem 0;
-    }
-
-    .footer {
-        text-align: center;
-        padding: 2rem 0;
-        color: #666;
-        border-top: 1px solid #e0e0e0;
-        margin-top: 3rem;
-    }
-
-    .stNumberInput > div > div > input {
-        border-radius: 10px;
-        border: 2px solid #e0e0e0;
-        padding: 0.5rem;
-    }
-
-    .stSelectbox > div > div > div {
-        border-radius: 10px;
-        border: 2px solid #e0e0e0;
-    }
-</style>
-""", unsafe_allow_html=True)
+st.markdown(f"<style>{load_css()}</style>", unsafe_allow_html=True)
+
+# Page HTML fragments, each region emitted with a single st.markdown call
+TITLE_HTML = """
+<div class="title-container">
+    <h1>👟 Shoe Size Prediction</h1>
+    <div class="subtitle">Enter your details below to estimate your shoe size.</div>
+</div>
+"""
+
+PREDICTION_HTML = """
+<div class="prediction-container">
+    <h2>✅ Predicted Shoe Size: {size}</h2>
+    <p style="font-size: 1.1rem; margin-top: 1rem; opacity: 0.9;">
+        Based on your age ({age} years), height ({height} cm), and gender ({gender})
+    </p>
+</div>
+"""
+
+INFO_HTML = """
+<div class="info-box">
+    <h4>💡 Important Note</h4>
+    <p>This prediction is based on statistical modeling and may vary from actual shoe sizes. 
+    Shoe sizes can differ between brands and styles. Always try on shoes before purchasing for the best fit!</p>
+</div>
+"""
+
+FOOTER_HTML = """
+<hr>
+<div class="footer">
+    <p>🤖 <strong>Powered by Machine Learning</strong> | Built with ❤️ using Streamlit</p>
+    <p style="font-size: 0.9rem; margin-top: 0.5rem;">
+        Accurate predictions through advanced regression modeling
+    </p>
+</div>
+"""
+
+# Input validation errors, indexed by bit position in the validation mask
+VALIDATION_MESSAGES = (
+    "❌ Please enter an age between 1 and 100 years",
+    "❌ Please enter a height between 50 and 250 cm",
+    "❌ Please select a gender",
+)
+
+def _forest_walker():
+    """Compile the tree-walking kernel, or return None when Numba is unavailable"""
+    # Numba is only imported when a forest model actually needs it
+    try:
+        from numba import njit
+    except ImportError:
+        return None
+
+    @njit(cache=True)
+    def _walk(F, T, V, L, R, x):
+        """Average the leaf values reached by x across a stack of flattened trees"""
+        total = 0.0
+        for t in range(F.shape[0]):
+            node = 0
+            while L[t, node] != -1:
+                if x[F[t, node]] <= T[t, node]:
+                    node = L[t, node]
+                else:
+                    node = R[t, node]
+            total += V[t, node]
+        return total / F.shape[0]
+
+    return _walk
+
+
+def _build_forest_predictor(model, walk):
+    """Flatten a tree-averaging ensemble into padded arrays walked by the kernel"""
+    trees = [est.tree_ for est in model.estimators_]
+    shape = (len(trees), max(tree.node_count for tree in trees))
+
+    F = np.zeros(shape, dtype=np.int32)
+    T = np.zeros(shape, dtype=np.float64)
+    V = np.zeros(shape, dtype=np.float64)
+    L = np.full(shape, -1, dtype=np.int32)
+    R = np.full(shape, -1, dtype=np.int32)
+    for i, tree in enumerate(trees):
+        n = tree.node_count
+        F[i, :n] = tree.feature
+        T[i, :n] = tree.threshold
+        V[i, :n] = tree.value[:, 0, 0]
+        L[i, :n] = tree.children_left
+        R[i, :n] = tree.children_right
+
+    def predict(age, height, gender_encoded):
+        # sklearn compares float32 inputs against the stored thresholds; the
+        # row is built per call so concurrent sessions never share it
+        x = np.array((age, height, gender_encoded), dtype=np.float32)
+        return walk(F, T, V, L, R, x)
+
+    return predict
+
+
+def _linear_predictor(intercept, coef, n_genders):
+    """Build a closed-form (age, height, gender_encoded) -> size function"""
+    # Fold the gender term into one float32 intercept per class, leaving two
+    # multiply-adds per prediction; float32 is ample for integer age and cm
+    intercepts = tuple((intercept + coef[2] * np.arange(n_genders)).astype(np.float32))
+    ca, ch = np.float32(coef[0]), np.float32(coef[1])
+    return lambda a, h, g: intercepts[g] + ca * a + ch * h
+
+
+def _build_predictor(model, n_genders):
+    """Return a fast (age, height, gender_encoded) -> size callable for the model"""
+    # Linear models reduce to a closed-form expression, so generate it directly
+    # instead of paying for sklearn's input validation and a 1x3 BLAS call
+    linear = linear_coefficients(model)
+    if linear is not None:
+        return _linear_predictor(*linear, n_genders)
+
+    # Random forests / extra trees are a plain average of trees, which Numba
+    # can walk without sklearn's per-tree call overhead
+    from sklearn.ensemble import ExtraTreesRegressor, RandomForestRegressor
+    if isinstance(model, (RandomForestRegressor, ExtraTreesRegressor)) and model.n_outputs_ == 1:
+        walk = _forest_walker()
+        if walk is not None:
+            return _build_forest_predictor(model, walk)
+
+    def predict(age, height, gender_encoded):
+        # Build the row per call: sessions run in separate threads, so a
+        # shared input buffer could be overwritten mid-prediction
+        input_data = np.array([[age, height, gender_encoded]], dtype=np.float64)
+        return model.predict(input_data)[0]
+
+    return predict
+
+
+def _read_packed_model():
+    """Read the packed linear model written by export_model.py"""
+    with open('assets/model.bin', 'rb') as f:
+        data = f.read()
+    b, c0, c1, c2 = struct.unpack_from(COEF_FORMAT, data)
+    offset = struct.calcsize(COEF_FORMAT)
+    if len(data) <= offset + DIGEST_SIZE:
+        raise ValueError(f"model.bin is truncated ({len(data)} bytes)")
+    digest, classes = data[offset:offset + DIGEST_SIZE], data[offset + DIGEST_SIZE:]
+
+    gender_options = tuple(classes.decode('utf-8').split('\n'))
+    return digest, gender_options, _linear_predictor(b, (c0, c1, c2), len(gender_options))
+
+
+def _load_sklearn_model(entries):
+    """Load the pickled label encoder and regression model"""
+    # pickle, joblib and the sklearn classes they unpickle are only imported
+    # when there is no usable packed model to serve from
+    import pickle
+    import joblib
+
+    # Load the label encoder
+    if 'label_encoder.pkl' not in entries:
+        st.error("❌ label_encoder.pkl not found in assets/ folder!")
+        st.stop()
+
+    with open('assets/label_encoder.pkl', 'rb') as f:
+        label_encoder = pickle.load(f)
+
+    # Precompute the selectbox options so reruns never touch the encoder's ndarray
+    gender_options = tuple(label_encoder.classes_.tolist())
+
+    # Load the regression model (memory-mapped so arrays are paged in lazily)
+    if 'model.joblib' not in entries:
+        st.error("❌ model.bin or model.joblib not found in assets/ folder!")
+        st.stop()
+
+    model = joblib.load('assets/model.joblib', mmap_mode='r')
+
+    # Specialize the prediction function for the loaded model
+    return gender_options, _build_predictor(model, len(gender_options))
+
+
+class LoadedModels(NamedTuple):
+    """Everything the app needs from the model assets"""
+    gender_options: tuple
+    gender_map: dict
+    predictor: Callable
+    notice: Optional[str]
 
 
 @st.cache_resource
 def load_models():
     """Load the trained model and label encoder with error handling"""
     try:
-        # Check if assets directory exists
-        if not os.path.exists('assets'):
+        # List the assets directory once instead of stat-ing each file
+        try:
+            entries = {entry.name for entry in os.scandir('assets')}
+        except FileNotFoundError:
             st.error("❌ Assets folder not found! Please create an 'assets/' folder with the required model files.")
             st.stop()
 
-        # Load the regression model
-        model_path = 'assets/model.pkl'
-        if not os.path.exists(model_path):
-            st.error("❌ model.pkl not found in assets/ folder!")
-            st.stop()
+        # Prefer the packed model, but only while it still matches the files it
+        # was exported from (when those are shipped alongside it). The warning
+        # is returned rather than shown here, since cached st calls are replayed
+        # on every load_models() call
+        notice = None
+        if 'model.bin' in entries:
+            try:
+                digest, gender_options, predictor = _read_packed_model()
+            except (OSError, ValueError, struct.error) as e:
+                notice = (f"⚠️ model.bin could not be read ({e}), serving model.joblib / label_encoder.pkl instead. "
+                          "Run export_model.py to refresh it.")
+            else:
+                if all(name in entries for name in SOURCE_FILES) and source_digest() != digest:
+                    notice = ("⚠️ model.bin is out of date with model.joblib / label_encoder.pkl, serving those instead. "
+                              "Run export_model.py to refresh it.")
+
+        if 'model.bin' not in entries or notice is not None:
+            gender_options, predictor = _load_sklearn_model(entries)
+
+            # Reclaim scratch objects left behind by unpickling
+            gc.collect()
+
+        # Precompute the gender -> code mapping so predictions are a dict lookup
+        gender_map = {c: i for i, c in enumerate(gender_options)}
+
+        return LoadedModels(gender_options, gender_map, predictor, notice)
 
-        with open(model_path, 'rb') as f:
-            model = pickle.load(f)
+    except Exception as e:
+        st.error(f"❌ Error loading model files: {str(e)}")
+        st.error("Please ensure 'model.bin' (or 'model.joblib' and 'label_encoder.pkl') are in the 'assets/' folder")
+        st.stop()
 
-        # Load the label encoder
-        encoder_path = 'assets/label_encoder.pkl'
-        if not os.path.exists(encoder_path):
-            st.error("❌ label_encoder.pkl not found in assets/ folder!")
-            st.stop()
 
-        with open(encoder_path, 'rb') as f:
-            label_encoder = pickle.load(f)
+@st.cache_data(max_entries=4096)
+def _predict_core(age: int, height: int, gender: str) -> float:
+    """Memoized numeric prediction for a single (age, height, gender) input"""
+    # The model is taken from the resource cache rather than passed in,
+    # so Streamlit only has to hash the three scalar inputs
+    models = load_models()
 
-        return model, label_encoder
+    # Encode gender using the precomputed label encoder mapping
+    gender_encoded = models.gender_map[gender]
 
-    except Exception as e:
-        st.error(f"❌ Error loading model files: {str(e)}")
-        st.error("Please ensure both 'model.pkl' and 'label_encoder.pkl' are in the 'assets/' folder")
-        st.stop()
+    # Make prediction
+    return float(models.predictor(age, height, gender_encoded))
 
 
-def predict_shoe_size(age, height, gender, model, label_encoder):
+def predict_shoe_size(age, height, gender):
     """Make shoe size prediction with proper error handling"""
     try:
-        # Encode gender using the label encoder
-        gender_encoded = label_encoder.transform([gender])[0]
-
-        # Create input array in the format [Age, Height, Gender_encoded]
-        input_data = np.array([[age, height, gender_encoded]])
-
-        # Make prediction
-        prediction = model.predict(input_data)[0]
+        prediction = _predict_core(int(age), int(height), gender)
 
         # Round to 2 decimal places
         return round(prediction, 2)
 
-    except ValueError as e:
+    except KeyError:
         st.error(f"❌ Invalid gender value: {gender}. Please select from available options.")
         return None
     except Exception as e:
@@ -180,118 +281,74 @@ def predict_shoe_size(age, height, gender, model, label_encoder):
 
 def main():
     # Title and header
-    st.markdown("""
-    <div class="title-container">
-        <h1>👟 Shoe Size Prediction</h1>
-        <div class="subtitle">Enter your details below to estimate your shoe size.</div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(TITLE_HTML, unsafe_allow_html=True)
 
     # Load models
-    model, label_encoder = load_models()
-
-    # Input section
-    st.markdown('<div class="input-container">', unsafe_allow_html=True)
-
-    # Create columns for better layout
-    col1, col2 = st.columns(2)
-
-    with col1:
-        st.markdown("### 📊 Personal Details")
-
-        # Age input with validation
-        age = st.number_input(
-            "Age (years)",
-            min_value=1,
-            max_value=100,
-            value=18,
-            step=1,
-            help="Enter your age between 1 and 100 years"
-        )
-
-        # Height input with validation
-        height = st.number_input(
-            "Height (cm)",
-            min_value=50,
-            max_value=250,
-            value=170,
-            step=1,
-            help="Enter your height in centimeters (50-250 cm)"
-        )
-
-    with col2:
-        st.markdown("### 👤 Gender Information")
-
-        # Get available gender options from label encoder
-        try:
-            gender_options = list(label_encoder.classes_)
+    models = load_models()
+    if models.notice:
+        st.warning(models.notice)
+
+    # Group the inputs in a form so the app only reruns on submit
+    with st.form("predict"):
+        # Create columns for better layout
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown("### 📊 Personal Details")
+
+            # Age input with validation
+            age = st.number_input(
+                "Age (years)",
+                min_value=1,
+                max_value=100,
+                value=18,
+                step=1,
+                help="Enter your age between 1 and 100 years"
+            )
+
+            # Height input with validation
+            height = st.number_input(
+                "Height (cm)",
+                min_value=50,
+                max_value=250,
+                value=170,
+                step=1,
+                help="Enter your height in centimeters (50-250 cm)"
+            )
+
+        with col2:
+            st.markdown("### 👤 Gender Information")
+
+            # Gender options come precomputed from the label encoder
             gender = st.selectbox(
                 "Gender",
-                options=gender_options,
+                options=models.gender_options,
                 help="Select your gender from the available options"
             )
-        except Exception as e:
-            st.error(f"Error loading gender options: {str(e)}")
-            gender = "Unknown"
-
-        # Display current selections
-        st.markdown("---")
-        st.markdown("**Current Selection:**")
-        st.write(f"👶 Age: {age} years")
-        st.write(f"📏 Height: {height} cm")
-        st.write(f"👤 Gender: {gender}")
-
-    st.markdown('</div>', unsafe_allow_html=True)
 
-    # Prediction button
-    predict_button = st.button("🔮 Predict Shoe Size")
+        # Prediction button
+        predict_button = st.form_submit_button("🔮 Predict Shoe Size")
 
     if predict_button:
-        # Validate inputs
-        if age < 1 or age > 100:
-            st.error("❌ Please enter an age between 1 and 100 years")
-        elif height < 50 or height > 250:
-            st.error("❌ Please enter a height between 50 and 250 cm")
-        elif not gender:
-            st.error("❌ Please select a gender")
+        # Validate inputs, collecting every failed check into one bitmask
+        err = (not 1 <= age <= 100) | (not 50 <= height <= 250) << 1 | (not gender) << 2
+        if err:
+            st.error("\n\n".join(msg for i, msg in enumerate(VALIDATION_MESSAGES) if err >> i & 1))
         else:
             # Show loading spinner
             with st.spinner("🔄 Calculating your shoe size..."):
                 # Make prediction
-                predicted_size = predict_shoe_size(age, height, gender, model, label_encoder)
+                predicted_size = predict_shoe_size(age, height, gender)
 
                 if predicted_size is not None:
-                    # Display result
-                    st.markdown(f"""
-                    <div class="prediction-container">
-                        <h2>✅ Predicted Shoe Size: {predicted_size}</h2>
-                        <p style="font-size: 1.1rem; margin-top: 1rem; opacity: 0.9;">
-                            Based on your age ({age} years), height ({height} cm), and gender ({gender})
-                        </p>
-                    </div>
-                    """, unsafe_allow_html=True)
-
-                    # Additional information
-                    st.markdown("""
-                    <div class="info-box">
-                        <h4>💡 Important Note</h4>
-                        <p>This prediction is based on statistical modeling and may vary from actual shoe sizes. 
-                        Shoe sizes can differ between brands and styles. Always try on shoes before purchasing for the best fit!</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-
-    # Divider
-    st.markdown("---")
-
-    # Footer
-    st.markdown("""
-    <div class="footer">
-        <p>🤖 <strong>Powered by Machine Learning</strong> | Built with ❤️ using Streamlit</p>
-        <p style="font-size: 0.9rem; margin-top: 0.5rem;">
-            Accurate predictions through advanced regression modeling
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+                    # Display result together with the additional information
+                    st.markdown(
+                        PREDICTION_HTML.format(size=predicted_size, age=age, height=height, gender=gender) + INFO_HTML,
+                        unsafe_allow_html=True
+                    )
+
+    # Divider and footer
+    st.markdown(FOOTER_HTML, unsafe_allow_html=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,69 @@
+import hashlib
+import os
+import pickle
+import struct
+import sys
+
+import numpy as np
+
+# Packed model layout: little-endian doubles (intercept, then the Age, Height
+# and Gender coefficients), the SHA-256 of the source files, then the label
+# encoder classes as newline-separated UTF-8
+COEF_FORMAT = '<4d'
+DIGEST_SIZE = 32
+SOURCE_FILES = ('model.joblib', 'label_encoder.pkl')
+
+
+def source_digest(assets_dir='assets'):
+    """SHA-256 over the model and label encoder files a packed model is built from"""
+    digest = hashlib.sha256()
+    for name in SOURCE_FILES:
+        with open(os.path.join(assets_dir, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.digest()
+
+
+def linear_coefficients(model):
+    """Return (intercept, (c_age, c_height, c_gender)) for a 3-feature linear model, else None"""
+    coef = getattr(model, 'coef_', None)
+    intercept = getattr(model, 'intercept_', None)
+    # SGDRegressor / LinearSVR store the intercept as a 1-element array
+    if coef is None or np.ndim(coef) != 1 or np.size(coef) != 3 or np.size(intercept) != 1:
+        return None
+    return float(np.ravel(intercept)[0]), tuple(float(c) for c in coef)
+
+
+def export_model(assets_dir='assets'):
+    """Pack a linear model's coefficients and gender classes into assets/model.bin"""
+    import joblib
+
+    model = joblib.load(os.path.join(assets_dir, 'model.joblib'))
+    with open(os.path.join(assets_dir, 'label_encoder.pkl'), 'rb') as f:
+        label_encoder = pickle.load(f)
+    output_path = os.path.join(assets_dir, 'model.bin')
+
+    # Only a 3-feature linear model reduces to intercept + coefficients
+    linear = linear_coefficients(model)
+    if linear is None:
+        sys.exit(f"❌ {type(model).__name__} is not a 3-feature linear model; delete {output_path} "
+                 f"so the app serves model.joblib directly")
+
+    # Build the whole payload before touching model.bin, recording the sources'
+    # digest so the app can detect a stale export
+    intercept, coef = linear
+    data = (struct.pack(COEF_FORMAT, intercept, *coef)
+            + source_digest(assets_dir)
+            + '\n'.join(label_encoder.classes_.tolist()).encode('utf-8'))
+
+    # Write to a temporary file and swap it in, so a failed export never
+    # leaves a truncated model.bin behind
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, output_path)
+
+    print(f"✅ Exported {type(model).__name__} to {output_path}")
+
+
+if __name__ == "__main__":
+    export_model()